@@ -2,12 +2,25 @@
 Pytest configuration for Playwright end-to-end tests.
 """
 
+import importlib
+import inspect
 import os
+import re
 import shutil
+import sys
+import types
 from pathlib import Path
 
 import pytest
-from playwright.sync_api import Browser, BrowserType, Playwright, sync_playwright
+import requests
+from playwright.sync_api import (
+    Browser,
+    BrowserContext,
+    BrowserType,
+    Playwright,
+    sync_playwright,
+)
+from requests.adapters import HTTPAdapter
 
 
 def _configure_playwright_nodejs_path() -> None:
@@ -29,6 +42,50 @@ def _configure_playwright_nodejs_path() -> None:
 _configure_playwright_nodejs_path()
 
 
+def _fast_stack(context: int = 1) -> list[inspect.FrameInfo]:
+    """Cheap stand-in for ``inspect.stack()`` that skips source-file lookups.
+
+    Only filename, line number and function name are filled in, which is all
+    Playwright reads when it records where an API call came from.
+    """
+    frames = []
+    frame = sys._getframe(1)
+    while frame is not None:
+        code = frame.f_code
+        frames.append(
+            inspect.FrameInfo(
+                frame, code.co_filename, frame.f_lineno, code.co_name, None, None
+            )
+        )
+        frame = frame.f_back
+    return frames
+
+
+def _speed_up_playwright_call_stacks() -> None:
+    """Make Playwright's per-call stack capture cheap.
+
+    The sync API captures ``inspect.stack()`` on every call, which resolves the
+    source file of every frame and dominates the Python-side cost of the suite.
+    Only Playwright's own modules are pointed at the fast variant; set
+    MALLA_E2E_DEBUG to keep the stock behaviour.
+    """
+
+    if os.environ.get("MALLA_E2E_DEBUG"):
+        return
+
+    fast_inspect = types.ModuleType("inspect")
+    fast_inspect.__dict__.update(inspect.__dict__)
+    fast_inspect.stack = _fast_stack
+
+    for name in ("playwright._impl._connection", "playwright._impl._sync_base"):
+        module = importlib.import_module(name)
+        if getattr(module, "inspect", None) is inspect:
+            module.inspect = fast_inspect
+
+
+_speed_up_playwright_call_stacks()
+
+
 def _discover_playwright_chromium_executable() -> str | None:
     """Return a packaged Chromium executable if one is available."""
 
@@ -91,6 +148,9 @@ def browser_type_launch_args():
             "--disable-gpu",
             "--disable-web-security",
             "--disable-features=VizDisplayCompositor",
+            "--disable-extensions",
+            "--disable-background-networking",
+            "--disable-background-timer-throttling",
         ],
     }
 
@@ -104,8 +164,85 @@ def browser_type_launch_args():
 
 @pytest.fixture(scope="function")
 def page(browser: Browser):
-    """Create a new page for each test."""
+    """Create a new page for each test.
+
+    The context is created directly rather than through the pytest-playwright
+    ``context`` fixture, so no tracing, video or screenshots are recorded.
+    """
     context = browser.new_context()
     page = context.new_page()
     yield page
     context.close()
+
+
+# Images, icon fonts and web fonts; none of them affect filter or table behaviour
+_STATIC_MEDIA_PATTERN = re.compile(
+    r"\.(png|jpe?g|gif|svg|ico|woff2?|ttf)(\?|$)|//fonts\.(googleapis|gstatic)\.com/"
+)
+
+
+def block_static_media(context: BrowserContext) -> None:
+    """Abort image and font requests in ``context`` to speed up page loads."""
+    context.route(_STATIC_MEDIA_PATTERN, lambda route: route.abort())
+
+
+@pytest.fixture(scope="module")
+def lean_context(browser: Browser):
+    """Provide a module-wide browser context that never fetches images or fonts."""
+    context = browser.new_context()
+    block_static_media(context)
+    yield context
+    context.close()
+
+
+@pytest.fixture(scope="module")
+def loaded_page(lean_context: BrowserContext, test_server_url: str):
+    """Provide a page that has already loaded /packets once for the module.
+
+    Tests navigate this page instead of opening a new context each time, so
+    the app's static assets are fetched once and then served from the
+    context's cache. Images and fonts are not fetched at all.
+    """
+    page = lean_context.new_page()
+    page.goto(f"{test_server_url}/packets")
+    return page
+
+
+@pytest.fixture(scope="session")
+def http():
+    """Provide a pooled HTTP session for direct API calls against the test server."""
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+    yield session
+    session.close()
+
+
+@pytest.fixture(scope="module")
+def warmup(
+    request: pytest.FixtureRequest, http: requests.Session, test_server_url: str
+) -> None:
+    """Fetch the module's WARMUP_PATHS once before its first test.
+
+    This warms the app server's templates and DB queries, so their first-hit
+    cost is not charged to whichever test happens to run first.
+    """
+    for path in getattr(request.module, "WARMUP_PATHS", ()):
+        http.get(f"{test_server_url}{path}", timeout=20)
+
+
+@pytest.fixture(scope="session")
+def api_baseline(http: requests.Session, test_server_url: str):
+    """Fetch /api/packets/data results, memoized per unique set of query params."""
+    cache: dict[tuple, dict] = {}
+
+    def _get(**params) -> dict:
+        key = tuple(sorted(params.items()))
+        if key not in cache:
+            response = http.get(
+                f"{test_server_url}/api/packets/data", params=params, timeout=10
+            )
+            response.raise_for_status()
+            cache[key] = response.json()
+        return cache[key]
+
+    return _get
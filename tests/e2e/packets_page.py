@@ -0,0 +1,22 @@
+"""
+Selectors, fixture node IDs and readers shared by the e2e tests that drive
+the /packets page.
+"""
+
+from playwright.sync_api import Page
+
+GATEWAY_ALPHA = "1128074276"  # Test Gateway Alpha
+BROADCAST = "4294967295"
+
+# Cells of rendered data rows; loading/empty placeholders use a single colspan cell
+DATA_CELL = "#packetsTable tbody tr td:not([colspan])"
+
+
+def snapshot_rows(page: Page, n: int = 5) -> list[list[str]]:
+    """Return the [From, To] cell text of the first ``n`` table rows in one call."""
+    return page.evaluate(
+        """(n) => Array.from(document.querySelectorAll('#packetsTable tbody tr'))
+            .slice(0, n)
+            .map((r) => [r.cells[1]?.innerText ?? '', r.cells[2]?.innerText ?? ''])""",
+        n,
+    )
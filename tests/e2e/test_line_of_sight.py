@@ -3,9 +3,44 @@ E2E tests for the line-of-sight analysis feature on the map.
 """
 
 import pytest
-from playwright.sync_api import Page, expect
+from playwright.sync_api import BrowserContext, Page, expect
+
+DEFAULT_TIMEOUT = 10000  # ms
+
+# Whether the map page source references the Line of Sight link and its icon
+LOS_TEMPLATE_CHECKS_JS = """
+() => {
+    const html = document.documentElement.outerHTML;
+    return {
+        hasLos: /line-of-sight/i.test(html) || html.includes('Line of Sight'),
+        hasIcon: html.includes('bi-bezier'),
+    };
+}
+"""
+
+
+@pytest.fixture
+def page(lean_context: BrowserContext):
+    """Open a fresh page per test in the module's shared context.
+
+    All waits default to DEFAULT_TIMEOUT. localStorage is cleared afterwards
+    so saved map preferences do not leak into the next test.
+    """
+    page = lean_context.new_page()
+    page.set_default_timeout(DEFAULT_TIMEOUT)
+    page.set_default_navigation_timeout(DEFAULT_TIMEOUT)
+    yield page
+    if page.url.startswith("http"):
+        page.evaluate("() => localStorage.clear()")
+    page.close()
+
 
-DEFAULT_TIMEOUT = 20000  # ms
+def wait_for_map_ready(page: Page) -> None:
+    """Wait until the map's node and link data has loaded and been drawn.
+
+    loadNodeLocations draws nodes and links before it hides #mapLoading.
+    """
+    page.wait_for_selector("#mapLoading", state="hidden")
 
 
 class TestLineOfSight:
@@ -14,48 +49,44 @@ class TestLineOfSight:
     @pytest.mark.e2e
     def test_line_of_sight_link_in_popup_template(self, page: Page, test_server_url):
         """Test that the line-of-sight link structure exists in link popups."""
-        page.goto(f"{test_server_url}/map")
-
-        # Wait for loading to complete
-        page.wait_for_selector("#mapLoading", state="hidden", timeout=DEFAULT_TIMEOUT)
-
-        # Enable traceroute links if not already enabled
-        links_checkbox = page.locator("#tracerouteLinksCheckbox")
-        if not links_checkbox.is_checked():
-            links_checkbox.click()
-            page.wait_for_timeout(1000)
+        page.goto(f"{test_server_url}/map", wait_until="domcontentloaded")
 
         # Wait for map data to load
-        page.wait_for_timeout(3000)
+        wait_for_map_ready(page)
+
+        # Enable traceroute links if not already enabled (check() is a no-op when
+        # it already is); the change handler redraws them synchronously from
+        # the already-loaded data
+        page.locator("#tracerouteLinksCheckbox").check()
 
         # Check if Line of Sight link functionality exists by examining the page source
-        # This is more reliable than trying to click on map elements
-        page_content = page.content()
+        # This is more reliable than trying to click on map elements. The
+        # search runs in the page so only the results cross back, not the HTML.
+        checks = page.evaluate(LOS_TEMPLATE_CHECKS_JS)
 
         # Verify the Line of Sight link template is in the page
         # The showLineOfSight or Line of Sight link should be referenced
-        assert (
-            "line-of-sight" in page_content.lower() or "Line of Sight" in page_content
-        ), "Line of Sight functionality should be available in the map page"
+        assert checks["hasLos"], (
+            "Line of Sight functionality should be available in the map page"
+        )
 
         # Verify the icon class is used
-        assert "bi-bezier" in page_content, "Line of Sight icon should be defined"
+        assert checks["hasIcon"], "Line of Sight icon should be defined"
 
     @pytest.mark.e2e
     def test_line_of_sight_route_exists(self, page: Page, test_server_url):
         """Test that the line-of-sight route is accessible."""
         # Simply verify the line-of-sight page can be accessed directly
-        page.goto(f"{test_server_url}/line-of-sight")
-
-        # Wait for page to load
-        page.wait_for_load_state("networkidle")
+        page.goto(f"{test_server_url}/line-of-sight", wait_until="domcontentloaded")
 
-        # Verify we're on the line-of-sight page
+        # Verify we're on the line-of-sight page; the expect auto-waits for it
         expect(page.locator("h1")).to_contain_text("Line of Sight Analysis")
 
         # Verify the route accepts parameters
-        page.goto(f"{test_server_url}/line-of-sight?from=123&to=456")
-        page.wait_for_load_state("networkidle")
+        page.goto(
+            f"{test_server_url}/line-of-sight?from=123&to=456",
+            wait_until="domcontentloaded",
+        )
 
         # Should still load without error
         expect(page.locator("h1")).to_contain_text("Line of Sight Analysis")
@@ -3,21 +3,118 @@ E2E tests for map filtering functionality.
 """
 
 import pytest
-from playwright.sync_api import Page, expect
+from playwright.sync_api import BrowserContext, Page, expect
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
 
 DEFAULT_TIMEOUT = 20000  # ms – allow extra time for map data to load
 
+# How long a stray /api/locations request gets to show up after filtering
+REFETCH_WINDOW = 500  # ms
+
+# No xdist group: the tests share no state, so --dist=loadgroup spreads them
+# across workers individually
+pytestmark = pytest.mark.e2e
+
+# Values of every option in a <select>
+OPTION_VALUES_JS = "(el) => [...el.options].map((o) => o.value)"
+
+# Polled until the marker count reads the same on two consecutive checks
+MARKERS_SETTLED_JS = """
+(state) => {
+    const count = document.querySelectorAll('.node-marker-container').length;
+    const settled = count === state.last;
+    state.last = count;
+    return settled;
+}
+"""
+
+# Node list, marker and stats counters read together in one round trip
+MAP_SNAPSHOT_JS = """
+() => ({
+    nodes: document.querySelectorAll('#nodeList .node-list-item').length,
+    markers: document.querySelectorAll('.node-marker-container').length,
+    nodeCount: document.getElementById('nodeCount')?.textContent,
+    links: document.getElementById('statsLinks')?.textContent,
+})
+"""
+
+
+# Filter form values after page load, with the start date's age in hours
+FILTER_DEFAULTS_JS = """
+() => {
+    const value = (id) => document.getElementById(id).value;
+    const start = value('startDateTime');
+    return {
+        maxAge: value('maxAge'),
+        start,
+        end: value('endDateTime'),
+        minContacts: value('minContacts'),
+        hoursAgo: start ? (Date.now() - new Date(start).getTime()) / 3.6e6 : null,
+    };
+}
+"""
+
+
+@pytest.fixture
+def page(lean_context: BrowserContext):
+    """Open a fresh page per test in the module's shared context.
+
+    The context caches the map's scripts and stylesheets after the first
+    /map load and never fetches map tiles, images or fonts. Leaflet's CSS3
+    animations are disabled, so the initial fit and later zooms land at once.
+    """
+    page = lean_context.new_page()
+    page.add_init_script("window.L_DISABLE_3D = true;")
+    yield page
+    page.close()
+
+
+def goto_map(page: Page, base_url: str) -> None:
+    """Open /map and wait until its node data has loaded and been drawn.
+
+    The filter form's defaults are applied before the data request is made,
+    so they are in place by the time #mapLoading is hidden.
+    """
+    page.goto(f"{base_url}/map")
+    page.wait_for_selector("#mapLoading", state="hidden", timeout=DEFAULT_TIMEOUT)
+
+
+def wait_for_markers_settled(page: Page) -> None:
+    """Wait for the initial map fit, then for marker clustering to stop changing."""
+    page.wait_for_function("window.mapReady === true", timeout=DEFAULT_TIMEOUT)
+    page.wait_for_function(MARKERS_SETTLED_JS, arg={"last": -1}, polling=250)
+
+
+def assert_no_locations_request(page: Page, seen: list[str], message: str) -> None:
+    """Assert that no /api/locations request was made.
+
+    Call once the filter's effect has settled. A late request still gets
+    REFETCH_WINDOW ms to arrive before the requests recorded in ``seen`` are
+    checked.
+    """
+    try:
+        with page.expect_request(
+            lambda request: "/api/locations" in request.url, timeout=REFETCH_WINDOW
+        ):
+            pass
+    except PlaywrightTimeoutError:
+        pass
+    else:
+        pytest.fail(message)
+    assert not [url for url in seen if "/api/locations" in url], message
+
+
+def map_snapshot(page: Page) -> dict:
+    """Return the node list, marker, node count and link count shown on the map."""
+    return page.evaluate(MAP_SNAPSHOT_JS)
+
 
 class TestMapFilters:
     """Test map filtering functionality."""
 
-    @pytest.mark.e2e
     def test_role_filter_options_available(self, page: Page, test_server_url):
         """Test that all role filter options are available."""
-        page.goto(f"{test_server_url}/map")
-
-        # Wait for loading to complete
-        page.wait_for_selector("#mapLoading", state="hidden", timeout=DEFAULT_TIMEOUT)
+        goto_map(page, test_server_url)
 
         # Check that role filter exists
         role_filter = page.locator("#roleFilter")
@@ -35,17 +132,13 @@ class TestMapFilters:
             "UNKNOWN",
         ]
 
-        for option_value in expected_options:
-            option = role_filter.locator(f"option[value='{option_value}']")
-            expect(option).to_be_attached()
+        option_values = role_filter.evaluate(OPTION_VALUES_JS)
+        missing = set(expected_options) - set(option_values)
+        assert not missing, f"Missing filter options: {sorted(missing)}"
 
-    @pytest.mark.e2e
     def test_age_filter_options_available(self, page: Page, test_server_url):
         """Test that all age filter options are available."""
-        page.goto(f"{test_server_url}/map")
-
-        # Wait for loading to complete
-        page.wait_for_selector("#mapLoading", state="hidden", timeout=DEFAULT_TIMEOUT)
+        goto_map(page, test_server_url)
 
         # Check that age filter exists
         age_filter = page.locator("#maxAge")
@@ -54,90 +147,69 @@ class TestMapFilters:
         # Check that all expected options are present
         expected_options = ["", "1", "6", "24", "72", "168"]
 
-        for option_value in expected_options:
-            option = age_filter.locator(f"option[value='{option_value}']")
-            expect(option).to_be_attached()
+        option_values = age_filter.evaluate(OPTION_VALUES_JS)
+        missing = set(expected_options) - set(option_values)
+        assert not missing, f"Missing filter options: {sorted(missing)}"
 
-    @pytest.mark.e2e
     def test_client_side_role_filtering(self, page: Page, test_server_url):
         """Test that role filtering works on client-side without server requests."""
-        page.goto(f"{test_server_url}/map")
-
-        # Wait for loading to complete
-        page.wait_for_selector("#mapLoading", state="hidden", timeout=DEFAULT_TIMEOUT)
+        goto_map(page, test_server_url)
 
         # Monitor network requests
         requests = []
         page.on("request", lambda request: requests.append(request.url))
 
-        # Clear previous requests
-        requests.clear()
-
         # Apply role filter
         role_filter = page.locator("#roleFilter")
         role_filter.select_option("ROUTER")
 
         apply_button = page.locator("#locationFilterForm button[type='submit']")
         apply_button.click()
-
-        # Wait for filtering to complete
-        page.wait_for_timeout(2000)
+        wait_for_markers_settled(page)
 
         # Check that no new API requests were made to /api/locations
-        location_requests = [req for req in requests if "/api/locations" in req]
-        assert len(location_requests) == 0, "Role filtering should be client-side only"
+        assert_no_locations_request(
+            page, requests, "Role filtering should be client-side only"
+        )
 
-    @pytest.mark.e2e
     def test_client_side_age_filtering(self, page: Page, test_server_url):
         """Test that age filtering works on client-side without server requests."""
-        page.goto(f"{test_server_url}/map")
-
-        # Wait for loading to complete
-        page.wait_for_selector("#mapLoading", state="hidden", timeout=DEFAULT_TIMEOUT)
+        goto_map(page, test_server_url)
 
         # Monitor network requests
         requests = []
         page.on("request", lambda request: requests.append(request.url))
 
         # Get initial node count
-        initial_count = page.locator("#nodeCount").text_content()
+        initial_count = map_snapshot(page)["nodeCount"]
         initial_count_int = int(initial_count) if initial_count else 0
 
-        # Clear previous requests
-        requests.clear()
-
         # Apply age filter (1 hour - should filter out most nodes)
         age_filter = page.locator("#maxAge")
         age_filter.select_option("1")
 
         apply_button = page.locator("#locationFilterForm button[type='submit']")
         apply_button.click()
-
-        # Wait for filtering to complete
-        page.wait_for_timeout(2000)
+        wait_for_markers_settled(page)
 
         # Check that no new API requests were made to /api/locations
-        location_requests = [req for req in requests if "/api/locations" in req]
-        assert len(location_requests) == 0, "Age filtering should be client-side only"
+        assert_no_locations_request(
+            page, requests, "Age filtering should be client-side only"
+        )
 
         # Verify filtering worked
-        filtered_count = page.locator("#nodeCount").text_content()
+        filtered_count = map_snapshot(page)["nodeCount"]
         filtered_count_int = int(filtered_count) if filtered_count else 0
 
         # Should have fewer nodes after 1-hour filter
         assert filtered_count_int <= initial_count_int
 
-    @pytest.mark.e2e
     def test_filter_reset_functionality(self, page: Page, test_server_url):
         """Test that filters can be reset to show all data."""
-        page.goto(f"{test_server_url}/map")
-
-        # Wait for loading to complete
-        page.wait_for_selector("#mapLoading", state="hidden", timeout=DEFAULT_TIMEOUT)
+        goto_map(page, test_server_url)
 
         # Get initial counts
-        initial_node_count = page.locator("#nodeCount").text_content()
-        initial_link_count = page.locator("#statsLinks").text_content()
+        initial = map_snapshot(page)
 
         # Apply filters
         age_filter = page.locator("#maxAge")
@@ -148,35 +220,28 @@ class TestMapFilters:
 
         apply_button = page.locator("#locationFilterForm button[type='submit']")
         apply_button.click()
-        page.wait_for_timeout(2000)
 
         # Reset filters
         age_filter.select_option("")
         role_filter.select_option("")
         apply_button.click()
-        page.wait_for_timeout(2000)
 
         # Verify counts return to initial values
-        final_node_count = page.locator("#nodeCount").text_content()
-        final_link_count = page.locator("#statsLinks").text_content()
+        final = map_snapshot(page)
 
-        assert final_node_count == initial_node_count, (
+        assert final["nodeCount"] == initial["nodeCount"], (
             "Node count should return to initial value"
         )
-        assert final_link_count == initial_link_count, (
+        assert final["links"] == initial["links"], (
             "Link count should return to initial value"
         )
 
-    @pytest.mark.e2e
     def test_filter_affects_node_list(self, page: Page, test_server_url):
         """Test that filters affect the node list display."""
-        page.goto(f"{test_server_url}/map")
-
-        # Wait for loading to complete
-        page.wait_for_selector("#mapLoading", state="hidden", timeout=DEFAULT_TIMEOUT)
+        goto_map(page, test_server_url)
 
         # Get initial node list items
-        initial_items = page.locator("#nodeList .node-list-item").count()
+        initial_items = map_snapshot(page)["nodes"]
 
         # Apply role filter
         role_filter = page.locator("#roleFilter")
@@ -184,25 +249,20 @@ class TestMapFilters:
 
         apply_button = page.locator("#locationFilterForm button[type='submit']")
         apply_button.click()
-        page.wait_for_timeout(2000)
 
         # Check that node list items changed
-        filtered_items = page.locator("#nodeList .node-list-item").count()
+        filtered_items = map_snapshot(page)["nodes"]
 
         # Should have fewer or equal items
         assert filtered_items <= initial_items
 
-    @pytest.mark.e2e
     def test_filter_affects_map_markers(self, page: Page, test_server_url):
         """Test that filters affect the map markers."""
-        page.goto(f"{test_server_url}/map")
-
-        # Wait for loading to complete
-        page.wait_for_selector("#mapLoading", state="hidden", timeout=DEFAULT_TIMEOUT)
-        page.wait_for_timeout(3000)  # Wait for markers to load
+        goto_map(page, test_server_url)
+        wait_for_markers_settled(page)
 
         # Count initial markers
-        initial_markers = page.locator(".node-marker-container").count()
+        initial_markers = map_snapshot(page)["markers"]
 
         # Apply restrictive age filter
         age_filter = page.locator("#maxAge")
@@ -210,21 +270,17 @@ class TestMapFilters:
 
         apply_button = page.locator("#locationFilterForm button[type='submit']")
         apply_button.click()
-        page.wait_for_timeout(3000)  # Wait for map to update
+        wait_for_markers_settled(page)
 
         # Count filtered markers
-        filtered_markers = page.locator(".node-marker-container").count()
+        filtered_markers = map_snapshot(page)["markers"]
 
         # Should have fewer or equal markers
         assert filtered_markers <= initial_markers
 
-    @pytest.mark.e2e
     def test_search_respects_active_filters(self, page: Page, test_server_url):
         """Test that node search respects active filters."""
-        page.goto(f"{test_server_url}/map")
-
-        # Wait for loading to complete
-        page.wait_for_selector("#mapLoading", state="hidden", timeout=DEFAULT_TIMEOUT)
+        goto_map(page, test_server_url)
 
         # Apply a role filter first
         role_filter = page.locator("#roleFilter")
@@ -232,29 +288,23 @@ class TestMapFilters:
 
         apply_button = page.locator("#locationFilterForm button[type='submit']")
         apply_button.click()
-        page.wait_for_timeout(2000)
 
         # Now search
         search_input = page.locator("#nodeSearch")
         search_input.fill("Test")
-        page.wait_for_timeout(1000)
 
         # Search results should only show nodes that match both the filter and search
         search_results = page.locator("#nodeList .node-list-item")
 
-        # All visible results should be from the filtered set
-        # (This is more of a smoke test - specific validation would require knowing test data)
-        if search_results.count() > 0:
-            # At least verify no errors occurred
-            expect(search_results.first).to_be_visible()
+        # The input handler renders the list and its result count together; the
+        # list must show exactly that many nodes
+        expect(page.locator("#searchResultsCount")).to_be_visible()
+        search_count = int(page.locator("#searchCount").text_content())
+        expect(search_results).to_have_count(search_count)
 
-    @pytest.mark.e2e
     def test_unknown_role_filtering(self, page: Page, test_server_url):
         """Test filtering for nodes with unknown/null roles."""
-        page.goto(f"{test_server_url}/map")
-
-        # Wait for loading to complete
-        page.wait_for_selector("#mapLoading", state="hidden", timeout=DEFAULT_TIMEOUT)
+        goto_map(page, test_server_url)
 
         # Apply unknown role filter
         role_filter = page.locator("#roleFilter")
@@ -262,7 +312,6 @@ class TestMapFilters:
 
         apply_button = page.locator("#locationFilterForm button[type='submit']")
         apply_button.click()
-        page.wait_for_timeout(2000)
 
         # Check that filtering completed without errors
         node_count = page.locator("#nodeCount").text_content()
@@ -271,13 +320,9 @@ class TestMapFilters:
         # Should be a valid count (could be 0)
         assert node_count_int >= 0
 
-    @pytest.mark.e2e
     def test_multiple_filter_combinations(self, page: Page, test_server_url):
         """Test various combinations of filters."""
-        page.goto(f"{test_server_url}/map")
-
-        # Wait for loading to complete
-        page.wait_for_selector("#mapLoading", state="hidden", timeout=DEFAULT_TIMEOUT)
+        goto_map(page, test_server_url)
 
         # Get references to form elements
         age_filter = page.locator("#maxAge")
@@ -296,16 +341,14 @@ class TestMapFilters:
             age_filter.select_option(age_value)
             role_filter.select_option(role_value)
             apply_button.click()
-            page.wait_for_timeout(2000)
 
             # Verify no errors
-            node_count = page.locator("#nodeCount").text_content()
-            assert node_count is not None, (
+            snapshot = map_snapshot(page)
+            assert snapshot["nodeCount"] is not None, (
                 f"Filter combination {age_value}h + {role_value} should work"
             )
 
-            link_count = page.locator("#statsLinks").text_content()
-            assert link_count is not None, (
+            assert snapshot["links"] is not None, (
                 f"Link count should be available for {age_value}h + {role_value}"
             )
 
@@ -313,80 +356,56 @@ class TestMapFilters:
         age_filter.select_option("")
         role_filter.select_option("")
         apply_button.click()
-        page.wait_for_timeout(2000)
 
-    @pytest.mark.e2e
     def test_default_max_age_is_24_hours(self, page: Page, test_server_url):
         """Test that the default max age is set to 24 hours."""
-        page.goto(f"{test_server_url}/map")
-
-        # Wait for loading to complete
-        page.wait_for_selector("#mapLoading", state="hidden", timeout=DEFAULT_TIMEOUT)
+        goto_map(page, test_server_url)
 
         # Check that age filter exists
         age_filter = page.locator("#maxAge")
         expect(age_filter).to_be_visible()
 
-        # Check that the default value is 24 hours
-        selected_value = age_filter.input_value()
+        # Check that the default value is 24 hours, and that the option is
+        # marked selected in the markup
+        selected_value, default_value = age_filter.evaluate(
+            "(el) => [el.value, el.querySelector('option[selected]')?.value]"
+        )
         assert selected_value == "24", (
             f"Default max age should be 24 hours, but got {selected_value}"
         )
+        assert default_value == "24", (
+            f"The 24 hours option should be selected by default, got {default_value}"
+        )
 
-        # Also verify the selected option
-        selected_option = age_filter.locator("option[selected]")
-        expect(selected_option).to_have_attribute("value", "24")
-
-    @pytest.mark.e2e
     def test_default_filter_configuration_applied(self, page: Page, test_server_url):
         """Test that the default filter configuration is applied correctly when the page loads."""
-        page.goto(f"{test_server_url}/map")
+        goto_map(page, test_server_url)
 
-        # Wait for loading to complete
-        page.wait_for_selector("#mapLoading", state="hidden", timeout=DEFAULT_TIMEOUT)
-
-        # Wait a bit more for JavaScript to initialize the form fields
-        page.wait_for_timeout(1000)
+        # Check that maxAge is visible; the form values are read in one pass
+        expect(page.locator("#maxAge")).to_be_visible()
+        state = page.evaluate(FILTER_DEFAULTS_JS)
 
         # Check that maxAge has the default value of 24 hours
-        age_filter = page.locator("#maxAge")
-        expect(age_filter).to_be_visible()
-        selected_value = age_filter.input_value()
-        assert selected_value == "24", (
-            f"Default max age should be 24 hours, but got {selected_value}"
+        assert state["maxAge"] == "24", (
+            f"Default max age should be 24 hours, but got {state['maxAge']}"
         )
 
         # Check that the start date input is populated based on the default maxAge
-        start_date_input = page.locator("#startDateTime")
-        start_value = start_date_input.input_value()
-        assert start_value != "", (
+        assert state["start"] != "", (
             "Start date should be populated based on default maxAge"
         )
 
         # Check that the end date input is empty (maxAge only sets start date)
-        end_date_input = page.locator("#endDateTime")
-        end_value = end_date_input.input_value()
-        assert end_value == "", "End date should be empty when maxAge is set"
+        assert state["end"] == "", "End date should be empty when maxAge is set"
 
         # Verify that the start date is approximately 24 hours ago
-        hours_ago = page.evaluate("""
-            () => {
-                const startValue = document.getElementById('startDateTime').value;
-                const startDate = new Date(startValue);
-                const now = new Date();
-                const timeDiffMs = now.getTime() - startDate.getTime();
-                return timeDiffMs / (1000 * 60 * 60);
-            }
-        """)
-
         # Allow for small variations due to rounding
+        hours_ago = state["hoursAgo"]
         assert 23.5 <= hours_ago <= 24.5, (
             f"Start date should be approximately 24 hours ago, but got {hours_ago} hours"
         )
 
         # Check that minContacts has the default value of 1
-        min_contacts_input = page.locator("#minContacts")
-        min_contacts_value = min_contacts_input.input_value()
-        assert min_contacts_value == "1", (
-            f"Default min contacts should be 1, but got {min_contacts_value}"
+        assert state["minContacts"] == "1", (
+            f"Default min contacts should be 1, but got {state['minContacts']}"
         )